@@ -0,0 +1,100 @@
+"""Refresh cost of the Dashboard grades table with synthetic marks.
+
+Run from the repository root:
+
+    python benchmarks/render_refresh.py
+
+For each size the first refresh builds every cell and fills the DataTable,
+the second one receives an identical copy of the data and should skip the
+widget entirely.
+"""
+
+import asyncio
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from textual.app import App  # noqa: E402
+
+from src.render import TableModel, grade_rows  # noqa: E402
+from src.screens import Dashboard  # noqa: E402
+
+SIZES = (1_000, 10_000)
+
+
+def make_grades(count):
+    return {
+        "subjects": [{"id": index, "name": f"Předmět {index}"} for index in range(20)],
+        "marks": [
+            {
+                "id": str(index),
+                "subjectId": index % 20,
+                "markText": str(index % 5 + 1),
+                "markDate": "2026-01-01T00:00:00",
+                "weight": 2,
+                "theme": f"Téma {index}",
+            }
+            for index in range(count)
+        ],
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_model(count):
+    data = make_grades(count)
+    subjects = {subject["id"]: subject["name"] for subject in data["subjects"]}
+    model = TableModel(grade_rows)
+    cold = timed(model.render, copy.deepcopy(data)["marks"], subjects)
+    warm = timed(model.render, copy.deepcopy(data)["marks"], subjects)
+    return cold, warm
+
+
+class _Api:
+    full_name = "Benchmark"
+    class_name = "-"
+
+    def get_grades(self):
+        return None
+
+
+class _BenchApp(App):
+    def on_mount(self):
+        self.push_screen(Dashboard(_Api()))
+
+
+async def bench_dashboard(counts):
+    results = {}
+    app = _BenchApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        dashboard = app.screen
+        for count in counts:
+            data = make_grades(count)
+            first, second = copy.deepcopy(data), copy.deepcopy(data)
+            cold = timed(dashboard.update_grades, first)
+            await pilot.pause()
+            warm = timed(dashboard.update_grades, second)
+            await pilot.pause()
+            results[count] = (cold, warm)
+    return results
+
+
+def main():
+    dashboard = asyncio.run(bench_dashboard(SIZES))
+    print(f"{'rows':>7}  {'render cold':>12}  {'render same':>12}  {'update cold':>12}  {'update same':>12}")
+    for count in SIZES:
+        cold, warm = bench_model(count)
+        ui_cold, ui_warm = dashboard[count]
+        print(f"{count:>7}  {cold:>10.1f}ms  {warm:>10.1f}ms  {ui_cold:>10.1f}ms  {ui_warm:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,18 @@
-from src.app import SolApp
+import sys
 
 
 def main():
+    if sys.argv[1:] == ["daemon"]:
+        from src.api.daemon import serve
+
+        serve()
+        return
+
+    from src.app import SolApp
+
     app = SolApp()
     app.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,21 +1,28 @@
+import threading
+from collections import OrderedDict
+
 from .behaviors import get_behaviors
 from .client import ApiClient
+from .daemon import connect_daemon
 from .homeworks import get_homework
 from .mark_detail import get_mark_detail
 from .marks import get_grades
-from .messages import get_messages
+from .messages import get_message_body, get_message_threads, get_messages
 from .schedule import get_schedule
 from .user import init_user_data
 from .utils import clean_html
+from ..config import USE_DAEMON
 
 
 class SolApi:
     def __init__(self):
-        self.client = ApiClient()
+        self.client = (USE_DAEMON and connect_daemon()) or ApiClient()
         self.person_id = None
         self.full_name = None
         self.semester_id = None
         self.class_name = None
+        self.message_bodies = OrderedDict()
+        self.message_bodies_lock = threading.Lock()
 
     def login(self, username, password):
         return self.client.login(username, password)
@@ -35,6 +42,12 @@ class SolApi:
     def get_messages(self):
         return get_messages(self)
 
+    def get_message_threads(self):
+        return get_message_threads(self)
+
+    def get_message_body(self, message_id):
+        return get_message_body(self, message_id)
+
     def get_behaviors(self):
         return get_behaviors(self)
 
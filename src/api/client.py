@@ -1,4 +1,5 @@
 import logging
+import threading
 from typing import Optional
 
 import requests
@@ -9,6 +10,10 @@ from ..config import BASE_URL, CLIENT_ID, DEBUG, TOKEN_URL
 class ApiClient:
     def __init__(self):
         self.token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.session = requests.Session()
+        # Serialises token updates; many daemon handler threads share one client.
+        self.lock = threading.RLock()
 
     def login(self, username: str, password: str):
         if DEBUG:
@@ -20,32 +25,57 @@ class ApiClient:
             "scope": "openid offline_access profile sol_api",
             "client_id": CLIENT_ID,
         }
+        return self._request_token(payload)
+
+    def refresh(self, stale_token=None):
+        with self.lock:
+            if stale_token is not None and self.token != stale_token:
+                # Another thread refreshed while we were waiting for the lock.
+                return True
+            if not self.refresh_token:
+                return False
+            payload = {
+                "grant_type": "refresh_token",
+                "refresh_token": self.refresh_token,
+                "client_id": CLIENT_ID,
+            }
+            success, _ = self._request_token(payload)
+            return success
+
+    def _request_token(self, payload):
         try:
-            response = requests.post(
+            response = self.session.post(
                 TOKEN_URL,
                 data=payload,
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
             )
             if response.status_code == 200:
-                self.token = response.json().get("access_token")
+                tokens = response.json()
+                with self.lock:
+                    self.token = tokens.get("access_token")
+                    self.refresh_token = tokens.get("refresh_token") or self.refresh_token
                 return True, "OK"
             return False, f"Error: {response.status_code}"
         except Exception as exc:
             return False, str(exc)
 
     def get(self, endpoint: str, params=None):
-        if not self.token:
+        token = self.token
+        if not token:
             return None
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-        }
         try:
-            response = requests.get(
-                f"{BASE_URL}/{endpoint}", headers=headers, params=params
-            )
+            response = self._get(endpoint, token, params)
+            if response.status_code == 401 and self.refresh(stale_token=token):
+                response = self._get(endpoint, self.token, params)
             if response.status_code == 200:
                 return response.json()
             return None
         except Exception:
             return None
+
+    def _get(self, endpoint: str, token: str, params=None):
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+        return self.session.get(f"{BASE_URL}/{endpoint}", headers=headers, params=params)
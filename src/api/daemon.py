@@ -0,0 +1,368 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from ..config import (
+    CACHE_TTL,
+    DAEMON_SOCKET,
+    DAEMON_TIMEOUT,
+    DEBUG,
+    MAX_SESSIONS,
+    POLL_INTERVAL,
+    POLL_WINDOW,
+    SESSION_TTL,
+)
+from .client import ApiClient
+
+# Only list endpoints change over time; details and message bodies are never polled.
+POLLED_ENDPOINTS = re.compile(
+    r"^v1/(students/[^/]+/(marks/list|homeworks|behaviors)|timeTable|messages/(received|sent))$"
+)
+
+
+class SessionExpired(Exception):
+    pass
+
+
+class _Upstream:
+    """One authenticated SOL account shared by all local sessions of that user."""
+
+    def __init__(self, username):
+        self.username = username
+        self.client = ApiClient()
+        self.salt = os.urandom(16)
+        self.digest = None
+        self.cache = {}
+        self.accessed = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def _hash(self, password):
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), self.salt, 100_000)
+
+    def remember(self, password):
+        self.digest = self._hash(password)
+
+    def matches(self, password):
+        return self.digest is not None and hmac.compare_digest(self.digest, self._hash(password))
+
+    def get(self, endpoint, params=None):
+        key = json.dumps([endpoint, params], sort_keys=True)
+        with self.lock:
+            self.accessed[key] = time.monotonic()
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same key wait here and reuse one fetch.
+        with key_lock:
+            cached = self.cache.get(key)
+            if cached and time.monotonic() - cached[0] < CACHE_TTL:
+                return cached[1]
+            return self._fetch(key, endpoint, params)
+
+    def _fetch(self, key, endpoint, params):
+        data = self.client.get(endpoint, params)
+        if data is not None:
+            self.cache[key] = (time.monotonic(), data)
+        return data
+
+    def poll(self):
+        now = time.monotonic()
+        with self.lock:
+            for key, accessed in list(self.accessed.items()):
+                if now - accessed > POLL_WINDOW:
+                    del self.accessed[key]
+                    self.cache.pop(key, None)
+                    self.key_locks.pop(key, None)
+            keys = [(key, self.key_locks[key]) for key in self.accessed]
+
+        for key, key_lock in keys:
+            endpoint, params = json.loads(key)
+            if not POLLED_ENDPOINTS.match(endpoint):
+                continue
+            with key_lock:
+                self._fetch(key, endpoint, params)
+
+
+class ApiGateway:
+    def __init__(self):
+        self.upstreams = {}
+        self.sessions = OrderedDict()
+        self.login_locks = {}
+        self.lock = threading.Lock()
+
+    def dispatch(self, request):
+        method = request.get("method")
+        if method == "ping":
+            return True
+        if method == "login":
+            return self.login(request["username"], request["password"])
+        if method == "get":
+            upstream = self.session(request.get("session"))
+            if upstream is None:
+                raise SessionExpired("Session is no longer valid")
+            return upstream.get(request["endpoint"], request.get("params"))
+        raise ValueError(f"Unknown method: {method}")
+
+    def session(self, session):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.sessions.get(session)
+            if entry is None:
+                return None
+            upstream, last_seen = entry
+            if now - last_seen > SESSION_TTL:
+                del self.sessions[session]
+                return None
+            self.sessions[session] = (upstream, now)
+            self.sessions.move_to_end(session)
+            return upstream
+
+    def login(self, username, password):
+        if DEBUG:
+            logging.info("Daemon login: %s", username)
+        with self.lock:
+            login_lock = self.login_locks.setdefault(username, threading.Lock())
+
+        # Concurrent logins of one user wait here and end up sharing one upstream.
+        with login_lock:
+            with self.lock:
+                upstream = self.upstreams.get(username)
+            if not (upstream and upstream.client.token and upstream.matches(password)):
+                upstream = _Upstream(username)
+                success, msg = upstream.client.login(username, password)
+                if not success:
+                    return False, msg, None
+                upstream.remember(password)
+
+            session = secrets.token_hex(16)
+            with self.lock:
+                replaced = self.upstreams.get(username)
+                if replaced is not None and replaced is not upstream:
+                    # Sessions opened with the old credentials must not outlive them.
+                    for key, (owner, _) in list(self.sessions.items()):
+                        if owner is replaced:
+                            del self.sessions[key]
+                self.upstreams[username] = upstream
+                self.sessions[session] = (upstream, time.monotonic())
+                while len(self.sessions) > MAX_SESSIONS:
+                    self.sessions.popitem(last=False)
+        return True, "OK", session
+
+    def prune(self):
+        now = time.monotonic()
+        with self.lock:
+            for key, (_, last_seen) in list(self.sessions.items()):
+                if now - last_seen > SESSION_TTL:
+                    del self.sessions[key]
+            alive = {id(upstream) for upstream, _ in self.sessions.values()}
+            for username, upstream in list(self.upstreams.items()):
+                if id(upstream) not in alive:
+                    del self.upstreams[username]
+            return list(self.upstreams.values())
+
+    def poll_forever(self):
+        while True:
+            time.sleep(POLL_INTERVAL)
+            for upstream in self.prune():
+                upstream.poll()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            response = {"result": self.server.gateway.dispatch(request)}
+        except SessionExpired as exc:
+            response = {"error": str(exc), "expired": True}
+        except Exception as exc:
+            response = {"error": str(exc)}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def _check_peer(sock):
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", creds)
+        if uid != os.getuid():
+            raise PermissionError("Daemon socket belongs to another user")
+
+
+def _private(st):
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _trusted(path):
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "getuid"):
+        return False
+    try:
+        directory = os.stat(os.path.dirname(path))
+        sock_stat = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(sock_stat.st_mode) and _private(sock_stat) and _private(directory)
+
+
+def _call(path, request):
+    if not _trusted(path):
+        raise PermissionError("Daemon socket is not private to the current user")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(DAEMON_TIMEOUT)
+        sock.connect(path)
+        _check_peer(sock)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as stream:
+            response = json.loads(stream.readline())
+    if response.get("expired"):
+        raise SessionExpired(response["error"])
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def _ping(path):
+    try:
+        return _call(path, {"method": "ping"}) is True
+    except Exception:
+        return False
+
+
+class DaemonClient:
+    """Drop-in replacement for ApiClient that talks to a running gateway daemon.
+
+    An expired session is renewed with the credentials of the last login. If the
+    daemon stops answering, the client logs in directly and keeps going through
+    an ApiClient instead.
+    """
+
+    def __init__(self, path=DAEMON_SOCKET):
+        self.path = path
+        self.token = None
+        self.direct = None
+        self._credentials = None
+        self._lock = threading.Lock()
+
+    def login(self, username: str, password: str):
+        self._credentials = (username, password)
+        if self.direct is not None:
+            return self.direct.login(username, password)
+        try:
+            success, msg, session = _call(
+                self.path,
+                {"method": "login", "username": username, "password": password},
+            )
+        except (OSError, ValueError):
+            return self._fall_back()
+        except Exception as exc:
+            return False, str(exc)
+        self.token = session
+        return success, msg
+
+    def get(self, endpoint: str, params=None):
+        # The second pass retries once after renewing the session or falling back.
+        for _ in range(2):
+            if self.direct is not None:
+                return self.direct.get(endpoint, params)
+            session = self.token
+            if not session:
+                return None
+            try:
+                return _call(
+                    self.path,
+                    {"method": "get", "session": session, "endpoint": endpoint, "params": params},
+                )
+            except SessionExpired:
+                if not self._renew(session):
+                    return None
+            except (OSError, ValueError):
+                if not self._fall_back()[0]:
+                    return None
+            except Exception:
+                return None
+        return None
+
+    def _renew(self, stale_session):
+        with self._lock:
+            if self.token != stale_session:
+                return True
+            if self._credentials is None:
+                return False
+            try:
+                success, _, session = _call(
+                    self.path,
+                    {"method": "login", "username": self._credentials[0], "password": self._credentials[1]},
+                )
+            except Exception:
+                return False
+            if success:
+                self.token = session
+            return success
+
+    def _fall_back(self):
+        with self._lock:
+            if self.direct is not None:
+                return True, "OK"
+            if self._credentials is None:
+                return False, "Daemon není dostupný"
+            if DEBUG:
+                logging.info("Daemon unavailable, switching to direct API access")
+            direct = ApiClient()
+            success, msg = direct.login(*self._credentials)
+            if success:
+                self.direct = direct
+            return success, msg
+
+
+def connect_daemon(path=DAEMON_SOCKET):
+    if _ping(path):
+        return DaemonClient(path)
+    return None
+
+
+def serve(path=DAEMON_SOCKET):
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "getuid"):
+        print("Daemon vyžaduje Unix sockety.")
+        return
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not _private(os.stat(directory)):
+        print(f"Adresář {directory} musí patřit aktuálnímu uživateli a mít práva 0700.")
+        return
+    if _ping(path):
+        print(f"Daemon již běží: {path}")
+        return
+    if os.path.lexists(path):
+        os.unlink(path)
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 64
+
+    gateway = ApiGateway()
+    umask = os.umask(0o177)
+    try:
+        server = Server(path, _Handler)
+    finally:
+        os.umask(umask)
+    server.gateway = gateway
+
+    threading.Thread(target=gateway.poll_forever, daemon=True).start()
+    print(f"Daemon naslouchá na {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
@@ -1,3 +1,13 @@
+import heapq
+import itertools
+import re
+
+from ..config import MESSAGE_BODY_CACHE, MESSAGE_PAGE_SIZE
+from .utils import clean_html
+
+REPLY_PREFIX = re.compile(r"^\s*((re|fw|fwd|odp|př)\s*:\s*)+", re.IGNORECASE)
+
+
 def get_messages(api):
     messages = []
     received = api.client.get("v1/messages/received", params={"Pagination.PageSize": 20})
@@ -14,3 +24,135 @@ def get_messages(api):
 
     messages.sort(key=lambda item: item.get("sentDate", ""), reverse=True)
     return messages
+
+
+def _sent_date(message):
+    return message.get("sentDate", "")
+
+
+def _message_key(message):
+    return message.get("id") or (_sent_date(message), message.get("subject"))
+
+
+def _headers(api, endpoint, direction):
+    # The API returns each folder newest first, page by page, so pages are only
+    # requested when the merge below actually reaches them.
+    seen = set()
+    for page in itertools.count(1):
+        data = api.client.get(
+            endpoint,
+            params={"Pagination.PageSize": MESSAGE_PAGE_SIZE, "Pagination.PageNumber": page},
+        )
+        if not data or not data.get("messages"):
+            return
+        fresh = [message for message in data["messages"] if _message_key(message) not in seen]
+        if not fresh:
+            # A page with nothing new means the API ignores paging, stop instead of looping.
+            return
+        for message in fresh:
+            seen.add(_message_key(message))
+            # Bodies are loaded on demand by get_message_body, don't keep them in the list.
+            message.pop("text", None)
+            message.pop("body", None)
+            message["dir"] = direction
+            yield message
+        if len(data["messages"]) < MESSAGE_PAGE_SIZE:
+            return
+
+
+def counterpart(message):
+    if message["dir"] == "IN":
+        return message.get("sender", {}).get("name", str(message.get("senderName", "?")))
+    return str(message.get("recipientName", "..."))
+
+
+class MessageThreads:
+    """Conversations built incrementally from the merged received/sent streams."""
+
+    def __init__(self, api):
+        self._merged = heapq.merge(
+            _headers(api, "v1/messages/received", "IN"),
+            _headers(api, "v1/messages/sent", "OUT"),
+            key=_sent_date,
+            reverse=True,
+        )
+        self._threads = {}
+        self._seen = set()
+        self.exhausted = False
+
+    def load_more(self, count=MESSAGE_PAGE_SIZE):
+        """Load up to ``count`` older messages.
+
+        Returns the newly created threads and the existing threads that grew.
+        Messages arrive newest first, so new threads always belong after the
+        ones returned earlier.
+        """
+        created, grown = {}, {}
+        loaded = 0
+        for message in itertools.islice(self._merged, count):
+            loaded += 1
+            thread, is_new = self._add(message)
+            if is_new:
+                created[thread["id"]] = thread
+            elif thread is not None and thread["id"] not in created:
+                grown[thread["id"]] = thread
+        if loaded < count:
+            self.exhausted = True
+        return list(created.values()), list(grown.values())
+
+    def _add(self, message):
+        message_key = _message_key(message)
+        if message_key in self._seen:
+            return None, False
+        self._seen.add(message_key)
+
+        subject = REPLY_PREFIX.sub("", str(message.get("subject", ""))).strip()
+        person = str(counterpart(message))
+        key = f"{person.casefold()}|{subject.casefold()}"
+        thread = self._threads.get(key)
+        if thread is not None:
+            thread["messages"].append(message)
+            return thread, False
+        thread = self._threads[key] = {
+            "id": key,
+            "subject": subject,
+            "person": person,
+            "sentDate": _sent_date(message),
+            "dir": message["dir"],
+            "messages": [message],
+        }
+        return thread, True
+
+
+def get_message_threads(api):
+    return MessageThreads(api)
+
+
+def get_message_body(api, message_id):
+    cache = api.message_bodies
+    with api.message_bodies_lock:
+        body = cache.get(message_id)
+        if body is not None:
+            cache.move_to_end(message_id)
+            return body
+
+    detail = api.client.get(f"v1/messages/{message_id}")
+    if not detail:
+        return None
+    body = {
+        "text": clean_html(detail.get("text") or detail.get("body")),
+        "attachments": [
+            {
+                "id": attachment.get("id"),
+                "name": attachment.get("name") or attachment.get("fileName", "?"),
+                "size": attachment.get("size"),
+            }
+            for attachment in detail.get("attachments") or []
+        ],
+    }
+    with api.message_bodies_lock:
+        cache[message_id] = body
+        cache.move_to_end(message_id)
+        while len(cache) > MESSAGE_BODY_CACHE:
+            cache.popitem(last=False)
+    return body
@@ -1,4 +1,5 @@
 import logging
+import os
 
 DEBUG = False
 
@@ -15,3 +16,18 @@ else:
 BASE_URL = "https://aplikace.skolaonline.cz/solapi/api"
 TOKEN_URL = f"{BASE_URL}/connect/token"
 CLIENT_ID = "test_client"
+
+USE_DAEMON = True
+# Fixed per-user location so TUI, scripts and cron jobs all find the same daemon.
+DAEMON_SOCKET = os.environ.get("SOL_DAEMON_SOCKET") or os.path.join(
+    os.path.expanduser("~"), ".cache", "sol-cli", "daemon.sock"
+)
+DAEMON_TIMEOUT = 60
+CACHE_TTL = 120
+POLL_INTERVAL = 90
+POLL_WINDOW = 300
+SESSION_TTL = 8 * 3600
+MAX_SESSIONS = 1024
+
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_BODY_CACHE = 200
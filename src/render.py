@@ -0,0 +1,107 @@
+import hashlib
+import json
+
+from rich.text import Text
+
+from .api import clean_html
+
+
+def fingerprint(record):
+    payload = json.dumps(record, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+class TableModel:
+    """Pre-built table rows cached by record id and content hash.
+
+    ``build`` turns one record into a list of row tuples. Rows of records that
+    did not change since the previous refresh are reused as-is, and ``render``
+    reports whether the table as a whole changed so the caller can skip
+    touching the widget entirely.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._rows = {}
+        self._context = None
+        self.digest = None
+
+    def render(self, records, context=None):
+        if context != self._context:
+            self._rows = {}
+            self._context = context
+
+        table = hashlib.blake2b(fingerprint(context), digest_size=16)
+        fresh = {}
+        rows = []
+        for record in records:
+            digest = fingerprint(record)
+            table.update(digest)
+            key = (record.get("id"), digest)
+            cells = fresh.get(key) or self._rows.get(key)
+            if cells is None:
+                cells = self._build(record, context)
+            fresh[key] = cells
+            rows.extend(cells)
+        self._rows = fresh
+
+        digest = table.digest()
+        changed = digest != self.digest
+        self.digest = digest
+        return changed, rows
+
+
+def grade_rows(mark, subjects):
+    subject = str(subjects.get(mark["subjectId"], "?"))
+    raw = str(mark.get("markText", "?"))
+
+    if raw == "1":
+        value = Text("1", style="bold green")
+    elif raw == "5":
+        value = Text("5", style="bold red")
+    elif raw == "Sl":
+        value = Text("Slovní", style="cyan")
+    else:
+        value = Text(raw)
+
+    date = str(mark.get("markDate", ""))[:10]
+    return [(date, subject, value, str(mark.get("weight", "")), str(mark.get("theme", "")))]
+
+
+def schedule_day_rows(day, _context):
+    day_name = str(day.get("date", ""))[:10]
+    rows = [(Text(day_name, style="bold white on blue"), "", "", "")]
+
+    schedules = sorted(day.get("schedules", []), key=lambda item: item["beginTime"])
+    for schedule in schedules:
+        time_range = f"{schedule['beginTime'][11:16]}-{schedule['endTime'][11:16]}"
+        subject = schedule.get("subject", {}).get("name") or schedule.get("hourType", {}).get("displayName", "Info")
+        room = schedule.get("room", {}).get("abbrev", "")
+        rows.append(("", time_range, str(subject), Text(str(room), style="yellow")))
+    return rows
+
+
+def thread_rows(thread, _context):
+    if thread["dir"] == "IN":
+        direction = Text("←", style="bold green")
+    else:
+        direction = Text("→", style="bold yellow")
+
+    date = str(thread.get("sentDate", ""))[:16].replace("T", " ")
+    count = len(thread["messages"])
+    return [(direction, date, thread["person"], thread["subject"], str(count))]
+
+
+def homework_rows(homework, _context):
+    subject = str(homework.get("subject", {}).get("name", "Předmět"))
+    date_to = Text(str(homework.get("dateTo", ""))[:10], style="red")
+    topic = str(homework.get("topic", ""))
+    description = clean_html(homework.get("detailedDescription") or homework.get("text"))[:60] + "..."
+    return [(subject, date_to, topic, description)]
+
+
+def behavior_rows(behavior, _context):
+    date = str(behavior.get("date", ""))[:10]
+    kind = Text(str(behavior.get("kindOfBehaviorName", "Info")), style="bold")
+    reason = behavior.get("behaviorReason", "") or "Bez popisu"
+    return [(date, kind, reason)]
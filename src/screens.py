@@ -1,8 +1,10 @@
 import logging
+from rich.markup import escape
 from textual import work
 from textual.app import App, ComposeResult, on
 from textual.containers import Center, Vertical, VerticalScroll
 from textual.screen import Screen
+from textual.worker import get_current_worker
 from textual.widgets import (
     Button,
     DataTable,
@@ -17,6 +19,14 @@ from textual.widgets import (
 
 from .api import SolApi
 from .config import DEBUG
+from .render import (
+    TableModel,
+    behavior_rows,
+    grade_rows,
+    homework_rows,
+    schedule_day_rows,
+    thread_rows,
+)
 
 
 class LoginScreen(Screen):
@@ -126,6 +136,83 @@ class MarkDetailScreen(Screen):
         self.app.pop_screen()
 
 
+class MessageThreadScreen(Screen):
+    CSS = """
+    MessageThreadScreen {
+        align: center middle;
+    }
+    #thread-box {
+        width: 100;
+        height: 90%;
+        border: heavy $primary;
+        padding: 1 2;
+        background: $panel;
+    }
+    .thread-label {
+        text-style: bold;
+        margin-bottom: 1;
+    }
+    .thread-message {
+        margin-bottom: 1;
+    }
+    """
+
+    def __init__(self, api: SolApi, thread: dict):
+        super().__init__()
+        self.api = api
+        self.thread = thread
+        # The pager keeps appending older messages to the live thread, render a stable copy.
+        self.messages = list(thread["messages"])
+
+    def compose(self) -> ComposeResult:
+        with Center():
+            with VerticalScroll(id="thread-box"):
+                yield Label(escape(f"{self.thread['subject']} – {self.thread['person']}"), classes="thread-label")
+                for index, message in enumerate(self.messages):
+                    yield Static(self.render_message(message, None), id=f"msg-{index}", classes="thread-message")
+                yield Button("Zavřít", variant="primary", id="close-btn")
+
+    def on_mount(self):
+        self.load_bodies()
+
+    @work(thread=True)
+    def load_bodies(self):
+        worker = get_current_worker()
+        for index, message in enumerate(self.messages):
+            if worker.is_cancelled:
+                return
+            message_id = message.get("id")
+            body = self.api.get_message_body(message_id) if message_id else None
+            if worker.is_cancelled:
+                return
+            self.app.call_from_thread(self.show_body, index, message, body)
+
+    def show_body(self, index, message, body):
+        if not self.is_attached:
+            return
+        content = self.render_message(message, body, failed=not body)
+        self.query_one(f"#msg-{index}", Static).update(content)
+
+    @staticmethod
+    def render_message(message, body, failed=False):
+        arrow = "[bold green]←[/]" if message["dir"] == "IN" else "[bold yellow]→[/]"
+        date = str(message.get("sentDate", ""))[:16].replace("T", " ")
+        lines = [f"{arrow} [bold]{date}[/bold] {escape(str(message.get('subject', '')))}"]
+        if failed:
+            lines.append("[red]Nepodařilo se načíst zprávu[/]")
+        elif body is None:
+            lines.append("[dim]Načítám...[/]")
+        else:
+            lines.append(escape(body["text"]))
+            for attachment in body.get("attachments", []):
+                lines.append(f"📎 {escape(str(attachment['name']))}")
+        return "\n".join(lines)
+
+    @on(Button.Pressed, "#close-btn")
+    def close_screen(self):
+        self.app.pop_screen()
+
+
 class Dashboard(Screen):
     CSS = """
     DataTable {
@@ -139,6 +226,13 @@ class Dashboard(Screen):
         super().__init__()
         self.api = api
         self.grades_data = None
+        self.grades_model = TableModel(grade_rows)
+        self.schedule_model = TableModel(schedule_day_rows)
+        self.message_threads = []
+        self.message_pager = None
+        self.loading_messages = False
+        self.homework_model = TableModel(homework_rows)
+        self.behavior_model = TableModel(behavior_rows)
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -173,7 +267,10 @@ class Dashboard(Screen):
         elif tab_id == "schedule":
             self.work_schedule()
         elif tab_id == "messages":
-            self.work_messages()
+            self.message_pager = self.api.get_message_threads()
+            self.message_threads = []
+            self.loading_messages = True
+            self.work_messages(self.message_pager)
         elif tab_id == "homework":
             self.work_homework()
         elif tab_id == "behavior":
@@ -191,9 +288,9 @@ class Dashboard(Screen):
         self.app.call_from_thread(self.update_schedule, data)
 
     @work(thread=True)
-    def work_messages(self):
-        data = self.api.get_messages()
-        self.app.call_from_thread(self.update_messages, data)
+    def work_messages(self, pager):
+        created, grown = pager.load_more()
+        self.app.call_from_thread(self.update_messages, pager, created, grown)
 
     @work(thread=True)
     def work_homework(self):
@@ -205,37 +302,39 @@ class Dashboard(Screen):
         data = self.api.get_behaviors()
         self.app.call_from_thread(self.update_behavior, data)
 
-    def update_grades(self, data):
-        dt = self.query_one("#grades_table", DataTable)
-        dt.clear(columns=True)
-        dt.add_columns("Datum", "Předmět", "Známka", "Váha", "Téma")
+    def fill_table(self, table_id, columns, model, records, placeholder, context=None):
+        changed, rows = model.render(records, context)
+        if changed:
+            dt = self.query_one(table_id, DataTable)
+            cursor_row = dt.cursor_row
+            dt.clear(columns=True)
+            dt.add_columns(*columns)
+            if rows:
+                dt.add_rows(rows)
+            else:
+                dt.add_row(*placeholder)
+            dt.move_cursor(row=min(cursor_row, dt.row_count - 1))
+        return rows
 
-        rows = []
+    def update_grades(self, data):
+        marks, subjects = [], {}
         if data and "marks" in data:
             if DEBUG:
                 logging.info("UI: Marks count: %s", len(data["marks"]))
+            marks = data["marks"]
             subjects = {subject["id"]: subject["name"] for subject in data.get("subjects", [])}
-            for mark in data["marks"]:
-                subject = str(subjects.get(mark["subjectId"], "?"))
-                raw = str(mark.get("markText", "?"))
-
-                if raw == "1":
-                    value = "[bold green]1[/]"
-                elif raw == "5":
-                    value = "[bold red]5[/]"
-                elif raw == "Sl":
-                    value = "[cyan]Slovní[/]"
-                else:
-                    value = raw
-
-                date = str(mark.get("markDate", ""))[:10]
-                rows.append((date, subject, value, str(mark.get("weight", "")), str(mark.get("theme", ""))))
 
+        rows = self.fill_table(
+            "#grades_table",
+            ("Datum", "Předmět", "Známka", "Váha", "Téma"),
+            self.grades_model,
+            marks,
+            ("---", "Žádné známky", "", "", ""),
+            context=subjects,
+        )
         if rows:
-            dt.add_rows(rows)
             self.query_one("#status_bar", Label).update(f"Známky: {len(rows)}")
         else:
-            dt.add_row("---", "Žádné známky", "", "", "")
             self.query_one("#status_bar", Label).update("Žádné známky.")
 
     @on(DataTable.RowSelected, "#grades_table")
@@ -250,92 +349,81 @@ class Dashboard(Screen):
                 self.app.push_screen(MarkDetailScreen(self.api, mark_id, mark))
 
     def update_schedule(self, data):
-        dt = self.query_one("#schedule_table", DataTable)
-        dt.clear(columns=True)
-        dt.add_columns("Den", "Čas", "Předmět", "Učebna")
-
-        rows = []
-        if data and "days" in data:
-            for day in data["days"]:
-                day_name = str(day.get("date", ""))[:10]
-                rows.append((f"[bold white on blue]{day_name}[/]", "", "", ""))
-
-                schedules = sorted(day.get("schedules", []), key=lambda item: item["beginTime"])
-                for schedule in schedules:
-                    time_range = f"{schedule['beginTime'][11:16]}-{schedule['endTime'][11:16]}"
-                    subject = schedule.get("subject", {}).get("name") or schedule.get("hourType", {}).get("displayName", "Info")
-                    room = schedule.get("room", {}).get("abbrev", "")
-                    rows.append(("", time_range, str(subject), f"[yellow]{room}[/]"))
-
+        days = data["days"] if data and "days" in data else []
+        rows = self.fill_table(
+            "#schedule_table",
+            ("Den", "Čas", "Předmět", "Učebna"),
+            self.schedule_model,
+            days,
+            ("", "", "Žádný rozvrh", ""),
+        )
         if rows:
-            dt.add_rows(rows)
             self.query_one("#status_bar", Label).update("Rozvrh načten.")
-        else:
-            dt.add_row("", "", "Žádný rozvrh", "")
 
-    def update_messages(self, messages):
+    def update_messages(self, pager, created, grown):
+        if pager is not self.message_pager:
+            return
+        self.loading_messages = False
         dt = self.query_one("#msg_table", DataTable)
-        dt.clear(columns=True)
-        dt.add_columns("Směr", "Datum", "Osoba", "Předmět", "Text")
 
-        rows = []
-        if messages:
-            if DEBUG:
-                logging.info("UI: Msgs count: %s", len(messages))
-            for message in messages:
-                direction = "[bold green]←[/]" if message["dir"] == "IN" else "[bold yellow]→[/]"
-                date = str(message.get("sentDate", ""))[:16].replace("T", " ")
+        # Each page only appends threads and bumps counts of known ones, so the
+        # table is patched in place rather than rebuilt.
+        if not self.message_threads:
+            dt.clear(columns=True)
+            for label in ("Směr", "Datum", "Osoba", "Předmět"):
+                dt.add_column(label)
+            dt.add_column("Zpráv", key="count")
+        for thread in grown:
+            dt.update_cell(thread["id"], "count", str(len(thread["messages"])))
+        for thread in created:
+            dt.add_row(*thread_rows(thread, None)[0], key=thread["id"])
+        self.message_threads.extend(created)
+
+        if DEBUG:
+            logging.info("UI: Threads count: %s", len(self.message_threads))
+        if self.message_threads:
+            self.query_one("#status_bar", Label).update(f"Konverzace: {len(self.message_threads)}")
+        else:
+            dt.add_row("-", "-", "Žádné zprávy", "-", "-")
+        # A page may only grow known threads, keep going while the cursor is still near the end.
+        self.load_more_messages(dt.cursor_row)
 
-                if message["dir"] == "IN":
-                    person = message.get("sender", {}).get("name", str(message.get("senderName", "?")))
-                else:
-                    person = str(message.get("recipientName", "..."))
+    @on(DataTable.RowHighlighted, "#msg_table")
+    def on_thread_highlighted(self, event: DataTable.RowHighlighted):
+        self.load_more_messages(event.cursor_row)
 
-                text = self.api.clean_html(message.get("text") or message.get("body"))[:50] + "..."
-                rows.append((direction, date, str(person), str(message.get("subject", "")), text))
+    def load_more_messages(self, cursor_row):
+        pager = self.message_pager
+        if not pager or pager.exhausted or self.loading_messages:
+            return
+        if cursor_row >= len(self.message_threads) - 10:
+            self.loading_messages = True
+            self.work_messages(pager)
 
-        if rows:
-            dt.add_rows(rows)
-            self.query_one("#status_bar", Label).update(f"Zprávy: {len(rows)}")
-        else:
-            dt.add_row("-", "-", "Žádné zprávy", "-", "-")
+    @on(DataTable.RowSelected, "#msg_table")
+    def on_thread_selected(self, event: DataTable.RowSelected):
+        if event.cursor_row < len(self.message_threads):
+            thread = self.message_threads[event.cursor_row]
+            self.app.push_screen(MessageThreadScreen(self.api, thread))
 
     def update_homework(self, data):
-        dt = self.query_one("#hw_table", DataTable)
-        dt.clear(columns=True)
-        dt.add_columns("Předmět", "Do kdy", "Téma", "Popis")
-
-        rows = []
-        if data and "homeworks" in data:
-            for homework in data["homeworks"]:
-                subject = str(homework.get("subject", {}).get("name", "Předmět"))
-                date_to = f"[red]{str(homework.get('dateTo', ''))[:10]}[/]"
-                topic = str(homework.get("topic", ""))
-                description = self.api.clean_html(
-                    homework.get("detailedDescription") or homework.get("text")
-                )[:60] + "..."
-                rows.append((subject, date_to, topic, description))
-
+        homeworks = data["homeworks"] if data and "homeworks" in data else []
+        rows = self.fill_table(
+            "#hw_table",
+            ("Předmět", "Do kdy", "Téma", "Popis"),
+            self.homework_model,
+            homeworks,
+            ("-", "-", "Žádné úkoly", "-"),
+        )
         if rows:
-            dt.add_rows(rows)
             self.query_one("#status_bar", Label).update(f"Úkoly: {len(rows)}")
-        else:
-            dt.add_row("-", "-", "Žádné úkoly", "-")
 
     def update_behavior(self, data):
-        dt = self.query_one("#behavior_table", DataTable)
-        dt.clear(columns=True)
-        dt.add_columns("Datum", "Typ", "Důvod")
-
-        rows = []
-        if data and "behaviors" in data:
-            for behavior in data["behaviors"]:
-                date = str(behavior.get("date", ""))[:10]
-                kind = f"[bold]{behavior.get('kindOfBehaviorName', 'Info')}[/]"
-                reason = behavior.get("behaviorReason", "") or "Bez popisu"
-                rows.append((date, kind, reason))
-
-        if rows:
-            dt.add_rows(rows)
-        else:
-            dt.add_row("-", "Žádné záznamy", "-")
+        behaviors = data["behaviors"] if data and "behaviors" in data else []
+        self.fill_table(
+            "#behavior_table",
+            ("Datum", "Typ", "Důvod"),
+            self.behavior_model,
+            behaviors,
+            ("-", "Žádné záznamy", "-"),
+        )